@@ -45,4 +45,5 @@ IMAGE_GENERATION = {
     "max_images_per_entity": 2,
     "image_quality": "standard",
     "image_size": "1024x1024",
+    "max_concurrent_requests": 8,  # Across all entities, to stay under the Gemini rate limit
 }
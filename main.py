@@ -1,37 +1,86 @@
-from fastapi import FastAPI
-from routes import health, travel, user, destination
-from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 load_dotenv()
-from fastapi.staticfiles import StaticFiles
+
 import os
+from contextlib import asynccontextmanager
+from typing import List
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from fastapi.staticfiles import StaticFiles
 from utils.files import static_dir, ensure_dir
+from services.perplexity_service import close_perplexity_service
+from routes import health, travel, user
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_list(name: str, default: List[str]) -> List[str]:
+    value = os.getenv(name)
+    if not value:
+        return default
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_perplexity_service()
+
+
+def create_app() -> FastAPI:
+    """Build the FastAPI app with the routers enabled for this deployment"""
+    app = FastAPI(
+        title="Travel Planner API",
+        description="AI-powered travel planning backend",
+        version="1.0.0",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
+    )
+
+    # Configure CORS with an explicit allowlist so responses carry precomputed headers,
+    # and let browsers cache preflights for a day
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=_env_list("FRONTEND_ORIGIN", ["http://localhost:3000"]),
+        allow_credentials=False,
+        allow_methods=["GET", "POST", "PUT"],
+        allow_headers=["Content-Type", "If-None-Match"],
+        max_age=86400,
+    )
+
+    # Include routers
+    app.include_router(health.router)
+    app.include_router(travel.router)
+    app.include_router(user.router)
+
+    if _env_flag("ENABLE_DESTINATIONS", True):
+        # Pulls in google.generativeai and configures it at import time
+        from routes import destination
+        app.include_router(destination.router)
+
+    # Mount static directory for generated images
+    ensure_dir(static_dir())
+    app.mount("/static", StaticFiles(directory=static_dir()), name="static")
+
+    return app
+
 
-app = FastAPI(
-    title="Travel Planner API",
-    description="AI-powered travel planning backend",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify your frontend domain
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(health.router)
-app.include_router(travel.router)
-app.include_router(user.router)
-app.include_router(destination.router)
-
-# Mount static directory for generated images
-ensure_dir(static_dir())
-app.mount("/static", StaticFiles(directory=static_dir()), name="static")
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+        access_log=False,
+    )
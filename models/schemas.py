@@ -2,6 +2,30 @@ from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
+# Travel plans (mock store in routes/travel.py)
+class Destination(BaseModel):
+    name: str
+    country: str
+    description: str = ""
+
+
+class TravelPlan(BaseModel):
+    destination: str
+    duration: int  # in days
+    budget: float
+    interests: List[str] = Field(default_factory=list)
+
+
+class TravelPlanResponse(BaseModel):
+    id: str
+    destination: str
+    duration: int
+    budget: float
+    interests: List[str]
+    status: str
+    created_at: str
+
+
 class ItineraryRequest(BaseModel):
     home_city: str
     destination_city: str
@@ -1,4 +1,5 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
+from utils.responses import PrecomputedJSON
 
 router = APIRouter(
     prefix="/health",
@@ -6,15 +7,14 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-@router.get("/")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy", "service": "Travel Planner API"}
+# Static payloads; clients must revalidate, but unchanged bodies come back as 304
+_HEALTH_RESPONSE = PrecomputedJSON(
+    {"status": "healthy", "service": "Travel Planner API"},
+    cache_control="no-cache",
+)
 
-@router.get("/detailed")
-async def detailed_health_check():
-    """Detailed health check with system information"""
-    return {
+_DETAILED_HEALTH_RESPONSE = PrecomputedJSON(
+    {
         "status": "healthy",
         "service": "Travel Planner API",
         "version": "1.0.0",
@@ -22,4 +22,16 @@ async def detailed_health_check():
             "health": "/health",
             "detailed_health": "/health/detailed"
         }
-    }
+    },
+    cache_control="no-cache",
+)
+
+@router.get("/")
+async def health_check(request: Request):
+    """Health check endpoint"""
+    return _HEALTH_RESPONSE.response(request)
+
+@router.get("/detailed")
+async def detailed_health_check(request: Request):
+    """Detailed health check with system information"""
+    return _DETAILED_HEALTH_RESPONSE.response(request)
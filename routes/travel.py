@@ -1,14 +1,27 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Any
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Request
+from typing import Any, Dict, List, Optional
+import itertools
+import logging
 import os
 import asyncio
+import orjson
 from google.genai import types as genai_types
-from services.gemini_service import async_gemini_generate_content, async_generate_image_files
-from services.perplexity_service import PerplexityService
+from services.gemini_service import (
+    async_gemini_generate_content,
+    async_gemini_stream_json,
+    async_generate_image_files,
+    user_text_contents,
+)
+from services.perplexity_service import get_perplexity_service
 from models.schemas import (
+    Destination,
+    TravelPlan,
+    TravelPlanResponse,
     ItineraryRequest,
     ItineraryResponse,
+    ItineraryDay,
+    ItineraryEntity,
+    ItineraryPlace,
     TravelOptionsRequest,
     TravelOptionsResponse,
 )
@@ -16,39 +29,154 @@ from prompts.system_itinerary import SYSTEM_PROMPT_ITINERARY
 from prompts.system_itinerary_places import SYSTEM_PROMPT_ITINERARY_PLACES
 from prompts.system_food_options import SYSTEM_PROMPT_FOOD_OPTIONS
 from prompts.system_travel_options import SYSTEM_PROMPT_TRAVEL_OPTIONS
-from utils.files import static_dir, ensure_dir
+from utils.files import static_dir, ensure_dir, served_url
+from utils.responses import PrecomputedJSON
 from models.schemas import ItineraryPlacesRequest, ItineraryPlacesResponse
 from config import MODELS, GEMINI_SETTINGS, PERPLEXITY_SETTINGS, IMAGE_GENERATION
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/travel",
     tags=["travel"],
     responses={404: {"description": "Not found"}},
 )
 
-# Pydantic models for request/response
-class Destination(BaseModel):
-    name: str
-    country: str
-    description: str = ""
-
-class TravelPlan(BaseModel):
-    destination: str
-    duration: int  # in days
-    budget: float
-    interests: List[str] = []
-
-class TravelPlanResponse(BaseModel):
-    id: str
-    destination: str
-    duration: int
-    budget: float
-    interests: List[str]
-    status: str
-    created_at: str
-
-# Mock data for demonstration
-travel_plans = []
+# Mock data for demonstration, keyed by plan id
+travel_plans: Dict[str, dict] = {}
+_plan_seq = itertools.count(1)
+
+# Gemini response schemas are identical across requests; build them once
+_ITINERARY_RESPONSE_SCHEMA = genai_types.Schema(
+    type=genai_types.Type.OBJECT,
+    required=["home_city", "destination_city", "num_days", "days"],
+    properties={
+        "home_city": genai_types.Schema(type=genai_types.Type.STRING),
+        "destination_city": genai_types.Schema(type=genai_types.Type.STRING),
+        "num_days": genai_types.Schema(type=genai_types.Type.INTEGER),
+        "days": genai_types.Schema(
+            type=genai_types.Type.ARRAY,
+            items=genai_types.Schema(
+                type=genai_types.Type.OBJECT,
+                required=["day", "summary", "entities"],
+                properties={
+                    "day": genai_types.Schema(type=genai_types.Type.INTEGER),
+                    "summary": genai_types.Schema(type=genai_types.Type.STRING),
+                    "route_info": genai_types.Schema(type=genai_types.Type.STRING),
+                    "entities": genai_types.Schema(
+                        type=genai_types.Type.ARRAY,
+                        items=genai_types.Schema(
+                            type=genai_types.Type.OBJECT,
+                            required=[
+                                "name",
+                                "speciality",
+                                "places_to_visit",
+                                "photo_prompts",
+                            ],
+                            properties={
+                                "name": genai_types.Schema(type=genai_types.Type.STRING),
+                                "speciality": genai_types.Schema(type=genai_types.Type.STRING),
+                                "places_to_visit": genai_types.Schema(
+                                    type=genai_types.Type.ARRAY,
+                                    items=genai_types.Schema(
+                                        type=genai_types.Type.OBJECT,
+                                        required=["name", "description"],
+                                        properties={
+                                            "name": genai_types.Schema(type=genai_types.Type.STRING),
+                                            "description": genai_types.Schema(type=genai_types.Type.STRING),
+                                        },
+                                    ),
+                                ),
+                                "photo_prompts": genai_types.Schema(
+                                    type=genai_types.Type.ARRAY,
+                                    items=genai_types.Schema(type=genai_types.Type.STRING),
+                                ),
+                            },
+                        ),
+                    ),
+                },
+            ),
+        ),
+        "overall_tips": genai_types.Schema(
+            type=genai_types.Type.ARRAY,
+            items=genai_types.Schema(type=genai_types.Type.STRING),
+        ),
+    },
+)
+
+_ITINERARY_PLACES_RESPONSE_SCHEMA = genai_types.Schema(
+    type=genai_types.Type.OBJECT,
+    required=["destination_city", "places"],
+    properties={
+        "destination_city": genai_types.Schema(type=genai_types.Type.STRING),
+        "places": genai_types.Schema(
+            type=genai_types.Type.ARRAY,
+            items=genai_types.Schema(
+                type=genai_types.Type.OBJECT,
+                required=["city", "place_name", "speciality", "tips", "photo_prompts"],
+                properties={
+                    "city": genai_types.Schema(type=genai_types.Type.STRING),
+                    "place_name": genai_types.Schema(type=genai_types.Type.STRING),
+                    "speciality": genai_types.Schema(type=genai_types.Type.STRING),
+                    "tips": genai_types.Schema(
+                        type=genai_types.Type.ARRAY,
+                        items=genai_types.Schema(type=genai_types.Type.STRING),
+                    ),
+                    "photo_prompts": genai_types.Schema(
+                        type=genai_types.Type.ARRAY,
+                        items=genai_types.Schema(type=genai_types.Type.STRING),
+                    ),
+                },
+            ),
+        ),
+    },
+)
+
+# Hardcoded list, so serialize it once and let clients revalidate with the ETag
+_DESTINATIONS_RESPONSE = PrecomputedJSON(
+    {
+        "destinations": [
+            {"name": "Paris", "country": "France", "description": "City of Light"},
+            {"name": "Tokyo", "country": "Japan", "description": "Modern metropolis"},
+            {"name": "Bali", "country": "Indonesia", "description": "Tropical paradise"},
+            {"name": "New York", "country": "USA", "description": "The Big Apple"}
+        ]
+    }
+)
+
+
+def _construct_itinerary(data: dict) -> ItineraryResponse:
+    """Build an ItineraryResponse from trusted model output without re-validating"""
+    days = []
+    for day in data.get("days", []):
+        entities = []
+        for entity in day.get("entities", []):
+            places = [
+                ItineraryPlace.model_construct(**place)
+                for place in entity.get("places_to_visit", [])
+            ]
+            entities.append(
+                ItineraryEntity.model_construct(**{**entity, "places_to_visit": places})
+            )
+        days.append(ItineraryDay.model_construct(**{**day, "entities": entities}))
+    return ItineraryResponse.model_construct(**{**data, "days": days})
+
+
+def _loads_json_object(text: str) -> Optional[dict]:
+    """Parse a JSON object, retrying once on the outermost {...} span if the model wrapped it in prose"""
+    try:
+        data = orjson.loads(text)
+    except orjson.JSONDecodeError:
+        start_idx = text.find('{')
+        end_idx = text.rfind('}') + 1
+        if start_idx == -1 or end_idx <= start_idx:
+            return None
+        try:
+            data = orjson.loads(text[start_idx:end_idx])
+        except orjson.JSONDecodeError:
+            return None
+    return data if isinstance(data, dict) else None
+
 
 @router.get("/")
 async def get_travel_info():
@@ -68,13 +196,13 @@ async def get_travel_info():
 @router.get("/plans")
 async def get_travel_plans():
     """Get all travel plans"""
-    return {"plans": travel_plans}
+    return {"plans": list(travel_plans.values())}
 
 @router.post("/plans")
 async def create_travel_plan(plan: TravelPlan):
     """Create a new travel plan"""
-    plan_id = f"plan_{len(travel_plans) + 1}"
-    new_plan = TravelPlanResponse(
+    plan_id = f"plan_{next(_plan_seq)}"
+    new_plan = TravelPlanResponse.model_construct(
         id=plan_id,
         destination=plan.destination,
         duration=plan.duration,
@@ -83,34 +211,28 @@ async def create_travel_plan(plan: TravelPlan):
         status="created",
         created_at="2024-01-01T00:00:00Z"  # In real app, use datetime.now()
     )
-    travel_plans.append(new_plan.dict())
+    travel_plans[plan_id] = new_plan.model_dump(mode="json")
     return {"message": "Travel plan created successfully", "plan": new_plan}
 
 @router.get("/plans/{plan_id}")
 async def get_travel_plan(plan_id: str):
     """Get a specific travel plan by ID"""
-    plan = next((p for p in travel_plans if p["id"] == plan_id), None)
+    plan = travel_plans.get(plan_id)
     if not plan:
         raise HTTPException(status_code=404, detail="Travel plan not found")
     return plan
 
 @router.get("/destinations")
-async def get_popular_destinations():
+async def get_popular_destinations(request: Request):
     """Get popular travel destinations"""
-    destinations = [
-        {"name": "Paris", "country": "France", "description": "City of Light"},
-        {"name": "Tokyo", "country": "Japan", "description": "Modern metropolis"},
-        {"name": "Bali", "country": "Indonesia", "description": "Tropical paradise"},
-        {"name": "New York", "country": "USA", "description": "The Big Apple"}
-    ]
-    return {"destinations": destinations}
+    return _DESTINATIONS_RESPONSE.response(request)
 
 @router.post("/destinations")
 async def add_destination(destination: Destination):
     """Add a new destination"""
     return {
         "message": "Destination added successfully",
-        "destination": destination.dict()
+        "destination": destination.model_dump(mode="json")
     }
 
 
@@ -127,70 +249,7 @@ async def generate_itinerary(payload: ItineraryRequest) -> Any:
             "Generate an end-to-end itinerary as per schema."
         )
 
-        contents = [
-            genai_types.Content(
-                role="user",
-                parts=[genai_types.Part.from_text(text=user_prompt)],
-            )
-        ]
-
-        # Structured schema for itinerary
-        response_schema = genai_types.Schema(
-            type=genai_types.Type.OBJECT,
-            required=["home_city", "destination_city", "num_days", "days"],
-            properties={
-                "home_city": genai_types.Schema(type=genai_types.Type.STRING),
-                "destination_city": genai_types.Schema(type=genai_types.Type.STRING),
-                "num_days": genai_types.Schema(type=genai_types.Type.INTEGER),
-                "days": genai_types.Schema(
-                    type=genai_types.Type.ARRAY,
-                    items=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        required=["day", "summary", "entities"],
-                        properties={
-                            "day": genai_types.Schema(type=genai_types.Type.INTEGER),
-                            "summary": genai_types.Schema(type=genai_types.Type.STRING),
-                            "route_info": genai_types.Schema(type=genai_types.Type.STRING),
-                            "entities": genai_types.Schema(
-                                type=genai_types.Type.ARRAY,
-                                items=genai_types.Schema(
-                                    type=genai_types.Type.OBJECT,
-                                    required=[
-                                        "name",
-                                        "speciality",
-                                        "places_to_visit",
-                                        "photo_prompts",
-                                    ],
-                                    properties={
-                                        "name": genai_types.Schema(type=genai_types.Type.STRING),
-                                        "speciality": genai_types.Schema(type=genai_types.Type.STRING),
-                                        "places_to_visit": genai_types.Schema(
-                                            type=genai_types.Type.ARRAY,
-                                            items=genai_types.Schema(
-                                                type=genai_types.Type.OBJECT,
-                                                required=["name", "description"],
-                                                properties={
-                                                    "name": genai_types.Schema(type=genai_types.Type.STRING),
-                                                    "description": genai_types.Schema(type=genai_types.Type.STRING),
-                                                },
-                                            ),
-                                        ),
-                                        "photo_prompts": genai_types.Schema(
-                                            type=genai_types.Type.ARRAY,
-                                            items=genai_types.Schema(type=genai_types.Type.STRING),
-                                        ),
-                                    },
-                                ),
-                            ),
-                        },
-                    ),
-                ),
-                "overall_tips": genai_types.Schema(
-                    type=genai_types.Type.ARRAY,
-                    items=genai_types.Schema(type=genai_types.Type.STRING),
-                ),
-            },
-        )
+        contents = user_text_contents(user_prompt)
 
         default_response = {
             "home_city": payload.home_city,
@@ -200,62 +259,75 @@ async def generate_itinerary(payload: ItineraryRequest) -> Any:
             "overall_tips": [],
         }
 
-        data = await async_gemini_generate_content(
-            model=MODELS["gemini"]["text"],
-            contents=contents,
-            system_prompt=system_prompt,
-            response_schema=response_schema,
-            temperature=GEMINI_SETTINGS["temperature"]["text"],
-            top_p=GEMINI_SETTINGS["top_p"]["text"],
-            max_output_tokens=GEMINI_SETTINGS["max_output_tokens"]["text"],
-            timeout=GEMINI_SETTINGS["timeout"]["text"],
-            default_response=default_response,
-        )
-
-        # Generate images for each entity using photo_prompts
-        image_base_url = "/static"
+        # Images for each entity are generated from its photo_prompts
         dest_slug = payload.destination_city.lower().replace(" ", "-")
         output_dir = os.path.join(static_dir(), f"itineraries/{dest_slug}")
         ensure_dir(output_dir)
 
-        # Collect all image generation tasks for parallel processing
-        image_tasks = []
-
-        for day in data.get("days", []):
-            for entity in day.get("entities", []):
-                prompts = entity.get("photo_prompts", [])[:IMAGE_GENERATION["max_images_per_entity"]]
-                if prompts:
-                    base_file_name = entity.get("name", "entity").lower().replace(" ", "-")
-                    task = async_generate_image_files(
+        # One slot per streamed entity, in document order; None when it has no prompts
+        image_tasks: List[Optional[asyncio.Task]] = []
+
+        def start_image_generation(entity: dict) -> None:
+            prompts = entity.get("photo_prompts", [])[:IMAGE_GENERATION["max_images_per_entity"]]
+            if not prompts:
+                image_tasks.append(None)
+                return
+            base_file_name = entity.get("name", "entity").lower().replace(" ", "-")
+            image_tasks.append(
+                asyncio.create_task(
+                    async_generate_image_files(
                         prompts=prompts,
                         output_dir=output_dir,
                         base_file_name=base_file_name,
                     )
-                    image_tasks.append((entity, task))
-
-        # Process all image generations in parallel
-        if image_tasks:
-            results = await asyncio.gather(*[task for _, task in image_tasks], return_exceptions=True)
+                )
+            )
 
-            # Handle results and assign to entities
-            for i, (entity, _) in enumerate(image_tasks):
-                result = results[i]
+        try:
+            # Stream the itinerary so image generation overlaps with the rest of the LLM output
+            data = await async_gemini_stream_json(
+                response_schema=_ITINERARY_RESPONSE_SCHEMA,
+                item_prefix="days.item.entities.item",
+                on_item=start_image_generation,
+                model=MODELS["gemini"]["text"],
+                contents=contents,
+                system_prompt=system_prompt,
+                temperature=GEMINI_SETTINGS["temperature"]["text"],
+                top_p=GEMINI_SETTINGS["top_p"]["text"],
+                max_output_tokens=GEMINI_SETTINGS["max_output_tokens"]["text"],
+                timeout=GEMINI_SETTINGS["timeout"]["text"],
+                default_response=default_response,
+            )
+            if data is default_response:
+                # Generation failed partway; images started for discarded entities are not needed
+                return _construct_itinerary(data)
+
+            pending = [task for task in image_tasks if task is not None]
+            results = await asyncio.gather(*pending, return_exceptions=True)
+            results_by_task = dict(zip(pending, results))
+
+            entities = [entity for day in data.get("days", []) for entity in day.get("entities", [])]
+            for entity in entities:
+                entity["image_urls"] = []
+
+            # Streamed entities map to the final document in order; zip keeps the common prefix
+            for entity, task in zip(entities, image_tasks):
+                if task is None:
+                    continue
+                result = results_by_task[task]
                 if isinstance(result, Exception):
-                    print(f"Image generation failed for {entity.get('name', 'entity')}: {result}")
-                    entity["image_urls"] = []
-                else:
-                    files = result
-                    # Convert to served URLs
-                    entity["image_urls"] = [
-                        f"{image_base_url}/{os.path.relpath(fp, static_dir())}" for fp in files
-                    ]
-        else:
-            # Set empty image_urls for entities without prompts
-            for day in data.get("days", []):
-                for entity in day.get("entities", []):
-                    entity["image_urls"] = []
-
-        return ItineraryResponse(**data)
+                    logger.warning("Image generation failed for %s: %s", entity.get("name", "entity"), result)
+                    continue
+                # Convert to served URLs
+                entity["image_urls"] = [served_url(fp) for fp in result]
+
+            # Gemini already enforces the shape via response_schema; skip re-validation
+            return _construct_itinerary(data)
+        finally:
+            # Covers the fallback path, errors and client disconnects; no-op for finished tasks
+            for task in image_tasks:
+                if task is not None:
+                    task.cancel()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -269,7 +341,7 @@ async def travel_options(payload: TravelOptionsRequest) -> Any:
             "List practical travel options by mode as per schema."
         )
 
-        svc = PerplexityService()
+        svc = get_perplexity_service()
         result = await svc.chat_completion(
             system_prompt=SYSTEM_PROMPT_TRAVEL_OPTIONS,
             user_prompt=user_prompt,
@@ -281,8 +353,8 @@ async def travel_options(payload: TravelOptionsRequest) -> Any:
             recency_filter=payload.recency_filter,
         )
 
-        # Debug: Log the response structure
-        print(f"DEBUG: Full response: {result}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Full response: %s", result)
 
         # Extract assistant message content; expect JSON accordance to schema
         choices = result.get("choices", [])
@@ -290,34 +362,13 @@ async def travel_options(payload: TravelOptionsRequest) -> Any:
         if choices:
             msg = choices[0].get("message", {})
             text = msg.get("content", "")
-            print(f"DEBUG: Extracted text: {text[:200]}...")  # First 200 chars
+            logger.debug("Extracted text: %s...", text[:200])
 
         # Expect JSON payload; attempt to parse
-        import json
-        data = None
-        if text:
-            try:
-                data = json.loads(text)
-                print("DEBUG: Successfully parsed JSON")
-            except json.JSONDecodeError as e:
-                print(f"DEBUG: JSON parsing failed: {e}")
-                print(f"DEBUG: Failed text: {text}")
-                # Try to clean up the text if it has formatting issues
-                start_idx = text.find('{')
-                end_idx = text.rfind('}') + 1
-                if start_idx != -1 and end_idx > start_idx:
-                    try:
-                        cleaned_text = text[start_idx:end_idx]
-                        data = json.loads(cleaned_text)
-                        print("DEBUG: Successfully parsed cleaned JSON")
-                    except Exception as clean_error:
-                        print(f"DEBUG: Cleaned JSON parsing also failed: {clean_error}")
-                        data = None
-                else:
-                    data = None
+        data = _loads_json_object(text) if text else None
 
         if data is None:
-            print("DEBUG: Using fallback structure")
+            logger.debug("Using fallback structure")
             # Fallback minimal structure
             data = {
                 "origin": payload.origin_city,
@@ -367,7 +418,7 @@ async def travel_options(payload: TravelOptionsRequest) -> Any:
 
         return TravelOptionsResponse(**data)
     except Exception as e:
-        print(f"DEBUG: Exception occurred: {e}")
+        logger.exception("Travel options failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -382,40 +433,7 @@ async def itinerary_places(req: ItineraryPlacesRequest) -> Any:
             "Return concise place cards as per schema."
         )
 
-        contents = [
-            genai_types.Content(
-                role="user",
-                parts=[genai_types.Part.from_text(text=user_prompt)],
-            )
-        ]
-
-        response_schema = genai_types.Schema(
-            type=genai_types.Type.OBJECT,
-            required=["destination_city", "places"],
-            properties={
-                "destination_city": genai_types.Schema(type=genai_types.Type.STRING),
-                "places": genai_types.Schema(
-                    type=genai_types.Type.ARRAY,
-                    items=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        required=["city", "place_name", "speciality", "tips", "photo_prompts"],
-                        properties={
-                            "city": genai_types.Schema(type=genai_types.Type.STRING),
-                            "place_name": genai_types.Schema(type=genai_types.Type.STRING),
-                            "speciality": genai_types.Schema(type=genai_types.Type.STRING),
-                            "tips": genai_types.Schema(
-                                type=genai_types.Type.ARRAY,
-                                items=genai_types.Schema(type=genai_types.Type.STRING),
-                            ),
-                            "photo_prompts": genai_types.Schema(
-                                type=genai_types.Type.ARRAY,
-                                items=genai_types.Schema(type=genai_types.Type.STRING),
-                            ),
-                        },
-                    ),
-                ),
-            },
-        )
+        contents = user_text_contents(user_prompt)
 
         default_response = {"destination_city": req.destination_city, "places": []}
 
@@ -423,7 +441,7 @@ async def itinerary_places(req: ItineraryPlacesRequest) -> Any:
             model=MODELS["gemini"]["text"],
             contents=contents,
             system_prompt=system_prompt,
-            response_schema=response_schema,
+            response_schema=_ITINERARY_PLACES_RESPONSE_SCHEMA,
             temperature=GEMINI_SETTINGS["temperature"]["text"],
             top_p=GEMINI_SETTINGS["top_p"]["text"],
             max_output_tokens=GEMINI_SETTINGS["max_output_tokens"]["text"],
@@ -432,7 +450,6 @@ async def itinerary_places(req: ItineraryPlacesRequest) -> Any:
         )
 
         # Generate images for each place
-        image_base_url = "/static"
         dest_slug = req.destination_city.lower().replace(" ", "-")
         output_dir = os.path.join(static_dir(), f"itineraries/{dest_slug}/places")
         ensure_dir(output_dir)
@@ -459,14 +476,12 @@ async def itinerary_places(req: ItineraryPlacesRequest) -> Any:
             for i, (place, _) in enumerate(image_tasks):
                 result = results[i]
                 if isinstance(result, Exception):
-                    print(f"Image generation failed for {place.get('place_name', 'place')}: {result}")
+                    logger.warning("Image generation failed for %s: %s", place.get("place_name", "place"), result)
                     place["image_urls"] = []
                 else:
                     files = result
                     # Convert to served URLs
-                    place["image_urls"] = [
-                        f"{image_base_url}/{os.path.relpath(fp, static_dir())}" for fp in files
-                    ]
+                    place["image_urls"] = [served_url(fp) for fp in files]
         else:
             # Set empty image_urls for places without prompts
             for place in data.get("places", []):
@@ -492,7 +507,7 @@ async def food_outlets(payload: dict) -> Any:
             "Return JSON as per schema only."
         )
 
-        svc = PerplexityService()
+        svc = get_perplexity_service()
         result = await svc.chat_completion(
             system_prompt=system_prompt,
             user_prompt=user_prompt,
@@ -511,9 +526,8 @@ async def food_outlets(payload: dict) -> Any:
             msg = choices[0].get("message", {})
             text = msg.get("content", "")
 
-        import json
         try:
-            data = json.loads(text)
+            data = orjson.loads(text)
         except Exception:
             data = {"city": req.city, "outlets": []}
 
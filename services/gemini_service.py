@@ -1,29 +1,87 @@
 import os
 import json
-import time
 import asyncio
-from typing import Any, List, Optional
+import logging
+import mimetypes
+from typing import Any, Callable, List, Optional
 
+import httpx
+import ijson
 from google import genai
 from google.genai import types
-from config import MODELS, GEMINI_SETTINGS
+from config import MODELS, GEMINI_SETTINGS, IMAGE_GENERATION
+from utils.files import ensure_dir
 
 
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
 
+logger = logging.getLogger(__name__)
+
+
+# One client per process so the underlying httpx pool keeps connections to Gemini alive
+async_client = genai.Client(
+    api_key=GEMINI_API_KEY,
+    http_options=types.HttpOptions(
+        async_client_args={
+            "http2": True,
+            "limits": httpx.Limits(max_keepalive_connections=50, keepalive_expiry=60),
+        },
+    ),
+)
+
 
 class GeminiService:
     def __init__(self) -> None:
         if not GEMINI_API_KEY:
             raise RuntimeError("GEMINI_API_KEY is not set in the environment")
-        self._client = genai.Client(api_key=GEMINI_API_KEY)
 
     @property
     def client(self) -> genai.Client:
-        return self._client
+        return async_client
+
+
+# Gemini only ever returns a handful of image MIME types; skip the mimetypes lookup for them
+_EXT_CACHE = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
+# Image requests all use the same config; build it once instead of per prompt
+_IMAGE_CONFIG = types.GenerateContentConfig(response_modalities=["IMAGE", "TEXT"])
+
+# Shared by every async_generate_image_files call so fan-out across entities stays bounded
+_image_semaphore = asyncio.Semaphore(IMAGE_GENERATION["max_concurrent_requests"])
+
 
+def user_text_contents(text: str) -> List[types.Content]:
+    """Single user turn holding text; Part(text=...) skips the from_text classmethod wrapper."""
+    return [types.Content(role="user", parts=[types.Part(text=text)])]
 
-async_client = genai.Client(api_key=GEMINI_API_KEY)
+
+def _log_json_decode_error(action: str, error: Exception, text: str) -> None:
+    # Responses run to several KB; only dump the full body when debugging
+    logger.warning("JSON decode error %s content: %s for response: %.200s", action, error, text)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Full undecodable response: %s", text)
+
+
+def _text_generate_config(
+    system_prompt: str,
+    response_schema: Optional[types.Schema],
+    temperature: float,
+    top_p: float,
+    top_k: int,
+    max_output_tokens: int,
+) -> types.GenerateContentConfig:
+    return types.GenerateContentConfig(
+        temperature=temperature,
+        top_p=top_p,
+        top_k=top_k,
+        max_output_tokens=max_output_tokens,
+        response_mime_type="application/json" if response_schema else None,
+        response_schema=response_schema,
+        system_instruction=[types.Part(text=system_prompt)]
+        if system_prompt
+        else None,
+        # thinking_config=types.ThinkingConfig(thinking_budget=0),
+    )
 
 
 async def async_gemini_generate_content(
@@ -49,32 +107,18 @@ async def async_gemini_generate_content(
         max_output_tokens = GEMINI_SETTINGS["max_output_tokens"]["text"]
     if timeout is None:
         timeout = GEMINI_SETTINGS["timeout"]["text"]
-    start_time = time.time()
     try:
-        generate_content_config = types.GenerateContentConfig(
-            temperature=temperature,
-            top_p=top_p,
-            top_k=top_k,
-            max_output_tokens=max_output_tokens,
-            response_mime_type="application/json" if response_schema else None,
-            response_schema=response_schema,
-            system_instruction=[types.Part.from_text(text=system_prompt)]
-            if system_prompt
-            else None,
-            # thinking_config=types.ThinkingConfig(thinking_budget=0),
-        )
-
-        response_task = asyncio.create_task(
-            async_client.aio.models.generate_content(
-                model=model, contents=contents or [], config=generate_content_config
-            )
+        generate_content_config = _text_generate_config(
+            system_prompt, response_schema, temperature, top_p, top_k, max_output_tokens
         )
 
         try:
-            response = await asyncio.wait_for(response_task, timeout=timeout)
-        except asyncio.TimeoutError as e:
-            response_task.cancel()
-            print(f"Timeout error generating content: {e}")
+            async with asyncio.timeout(timeout):
+                response = await async_client.aio.models.generate_content(
+                    model=model, contents=contents or [], config=generate_content_config
+                )
+        except TimeoutError as e:
+            logger.warning("Timeout error generating content: %s", e)
             return default_response
 
         if response:
@@ -85,7 +129,7 @@ async def async_gemini_generate_content(
                     else:
                         return default_response
                 except json.JSONDecodeError as e:
-                    print(f"JSON decode error generating content: {e} for response: {response.text}")
+                    _log_json_decode_error("generating", e, response.text)
                     return default_response
             else:
                 if response.text:
@@ -93,46 +137,114 @@ async def async_gemini_generate_content(
                 else:
                     return default_response
         else:
-            print(f"No response generating content: {response}")
+            logger.warning("No response generating content: %s", response)
             return default_response
 
     except Exception as e:
-        print(f"Error generating content: {e}")
+        logger.warning("Error generating content: %s", e)
+        return default_response
+
+
+async def async_gemini_stream_json(
+    response_schema: types.Schema,
+    item_prefix: str,
+    on_item: Callable[[Any], None],
+    model: str = None,
+    contents: Optional[List[types.Content]] = None,
+    system_prompt: str = "",
+    temperature: float = None,
+    top_p: float = None,
+    top_k: int = 40,
+    max_output_tokens: int = None,
+    timeout: int = None,
+    default_response: Any = None,
+) -> Any:
+    """
+    Stream a structured JSON response and call on_item for every object at item_prefix
+    (an ijson prefix such as "days.item.entities.item") as soon as it has been fully
+    decoded, so callers can start follow-up work before generation finishes.
+    Returns the complete parsed document, or the default_response object itself on failure
+    so callers can detect the fallback with an identity check.
+    """
+    if model is None:
+        model = MODELS["gemini"]["text"]
+    if temperature is None:
+        temperature = GEMINI_SETTINGS["temperature"]["text"]
+    if top_p is None:
+        top_p = GEMINI_SETTINGS["top_p"]["text"]
+    if max_output_tokens is None:
+        max_output_tokens = GEMINI_SETTINGS["max_output_tokens"]["text"]
+    if timeout is None:
+        timeout = GEMINI_SETTINGS["timeout"]["text"]
+
+    generate_content_config = _text_generate_config(
+        system_prompt, response_schema, temperature, top_p, top_k, max_output_tokens
+    )
+
+    text_parts: List[str] = []
+    items = ijson.sendable_list()
+    parser = ijson.items_coro(items, item_prefix, use_float=True)
+
+    try:
+        async with asyncio.timeout(timeout):
+            stream = await async_client.aio.models.generate_content_stream(
+                model=model, contents=contents or [], config=generate_content_config
+            )
+            async for chunk in stream:
+                if not chunk.text:
+                    continue
+                text_parts.append(chunk.text)
+                if parser is None:
+                    continue
+                try:
+                    parser.send(chunk.text.encode())
+                except ijson.JSONError:
+                    # Leave it to the final json.loads to decide whether the document is usable
+                    parser = None
+                    continue
+                for item in items:
+                    on_item(item)
+                items.clear()
+    except TimeoutError as e:
+        logger.warning("Timeout error streaming content: %s", e)
+        return default_response
+    except Exception as e:
+        logger.warning("Error streaming content: %s", e)
+        return default_response
+
+    text = "".join(text_parts)
+    if not text:
+        return default_response
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        _log_json_decode_error("streaming", e, text)
         return default_response
-    finally:
-        _ = time.time() - start_time
+
+
+def _write_bytes(file_path: str, data: bytes) -> None:
+    with open(file_path, "wb") as f:
+        f.write(data)
 
 
 async def async_generate_image_files(
     prompts: List[str], output_dir: str, base_file_name: str
 ) -> List[str]:
-    os.makedirs(output_dir, exist_ok=True)
+    ensure_dir(output_dir)
 
     model = MODELS["gemini"]["image"]
 
-    contents_list: List[List[types.Content]] = []
-    for prompt in prompts:
-        contents_list.append(
-            [
-                types.Content(
-                    role="user",
-                    parts=[types.Part.from_text(text=prompt)],
-                )
-            ]
-        )
+    contents_list = [user_text_contents(prompt) for prompt in prompts]
 
     async def _gen_for_index(index: int, contents: List[types.Content]) -> Optional[str]:
-        generate_content_config = types.GenerateContentConfig(
-            response_modalities=["IMAGE", "TEXT"],
-        )
-
         file_name_prefix = f"{base_file_name}_{index}"
         file_path_result: Optional[str] = None
 
         try:
-            response = await async_client.aio.models.generate_content(
-                model=model, contents=contents, config=generate_content_config
-            )
+            async with _image_semaphore:
+                response = await async_client.aio.models.generate_content(
+                    model=model, contents=contents, config=_IMAGE_CONFIG
+                )
 
             if response and response.candidates:
                 candidate = response.candidates[0]
@@ -141,14 +253,15 @@ async def async_generate_image_files(
                         if getattr(part, "inline_data", None) and getattr(part.inline_data, "data", None):
                             data_buffer = part.inline_data.data
                             mime_type = part.inline_data.mime_type
-                            import mimetypes
-
-                            file_extension = mimetypes.guess_extension(mime_type) or ".bin"
+                            file_extension = (
+                                _EXT_CACHE.get(mime_type)
+                                or mimetypes.guess_extension(mime_type)
+                                or ".bin"
+                            )
                             file_path = os.path.join(
                                 output_dir, f"{file_name_prefix}_{part_index}{file_extension}"
                             )
-                            with open(file_path, "wb") as f:
-                                f.write(data_buffer)
+                            await asyncio.to_thread(_write_bytes, file_path, data_buffer)
                             file_path_result = file_path
                             break  # Take only the first image
         except Exception:
@@ -1,18 +1,32 @@
+import logging
 import os
 from typing import Any, Dict, List, Optional
 
-from utils.async_query import AsyncRequests
+import httpx
 
 
 PERPLEXITY_API_KEY = os.environ.get("PERPLEXITY_API_KEY", "")
 PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
 
+logger = logging.getLogger(__name__)
+
 
 class PerplexityService:
     def __init__(self, api_key: Optional[str] = None) -> None:
         self.api_key = api_key or PERPLEXITY_API_KEY
         if not self.api_key:
             raise RuntimeError("PERPLEXITY_API_KEY is not set in the environment")
+        # Long timeout: web-search completions routinely take well over 30s
+        self._client = httpx.AsyncClient(
+            base_url=PERPLEXITY_BASE_URL,
+            headers=self._headers(),
+            http2=True,
+            timeout=httpx.Timeout(120.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32),
+        )
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
 
     def _headers(self) -> Dict[str, str]:
         return {
@@ -58,13 +72,33 @@ class PerplexityService:
             if recency_filter:
                 request_body["search_recency_filter"] = recency_filter
 
-            url = f"{PERPLEXITY_BASE_URL}/chat/completions"
-            response = await AsyncRequests.post(url, headers=self._headers(), json=request_body)
-            print(f"Response: {response.json()}")
+            try:
+                response = await self._client.post("/chat/completions", json=request_body)
+            except httpx.TransportError as e:
+                # Stale pooled connection or transient network error; retry once on a fresh one
+                logger.warning("Perplexity request failed, retrying once: %s", e)
+                response = await self._client.post("/chat/completions", json=request_body)
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            print(f"Error generating content: {e}")
+            logger.warning("Error generating content: %s", e)
             return {}
 
 
+_perplexity_service: Optional[PerplexityService] = None
+
+
+def get_perplexity_service() -> PerplexityService:
+    """Return the process-wide PerplexityService, creating it on first use."""
+    global _perplexity_service
+    if _perplexity_service is None:
+        _perplexity_service = PerplexityService()
+    return _perplexity_service
+
+
+async def close_perplexity_service() -> None:
+    """Close the shared client, if one was ever created."""
+    global _perplexity_service
+    if _perplexity_service is not None:
+        await _perplexity_service.aclose()
+        _perplexity_service = None
@@ -1,15 +1,34 @@
+import functools
 import os
+from typing import Set
+
+
+# Directories already created by this process; skips the makedirs stat on repeat calls
+_ensured: Set[str] = set()
 
 
 def ensure_dir(path: str) -> None:
+    if path in _ensured:
+        return
     os.makedirs(path, exist_ok=True)
+    _ensured.add(path)
 
 
 def project_root() -> str:
     return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
+@functools.cache
 def static_dir() -> str:
-    return os.path.join(project_root(), "static")
+    return os.getenv("STATIC_DIR") or os.path.join(project_root(), "static")
+
+
+@functools.cache
+def _static_prefix() -> str:
+    return static_dir().rstrip(os.sep) + os.sep
 
 
+def served_url(file_path: str) -> str:
+    """URL under the /static mount for a file written inside static_dir()."""
+    # Generated files always live under static_dir(), so strip the prefix instead of calling relpath
+    return f"/static/{file_path.removeprefix(_static_prefix())}"
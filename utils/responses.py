@@ -0,0 +1,27 @@
+import hashlib
+from typing import Any
+
+import orjson
+from fastapi import Request, Response
+
+
+class PrecomputedJSON:
+    """
+    JSON body serialized once at import time and served as raw bytes with an ETag.
+    A fresh Response is built per request because middleware mutates response headers in place.
+    """
+
+    def __init__(self, content: Any, cache_control: str = "public, max-age=3600") -> None:
+        self.body = orjson.dumps(content)
+        self.etag = f'"{hashlib.sha1(self.body).hexdigest()[:16]}"'
+        self.headers = {"cache-control": cache_control, "etag": self.etag}
+
+    def _matches(self, if_none_match: str) -> bool:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or self.etag in tags
+
+    def response(self, request: Request) -> Response:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and self._matches(if_none_match):
+            return Response(status_code=304, headers=self.headers)
+        return Response(content=self.body, media_type="application/json", headers=self.headers)